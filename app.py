@@ -1,5 +1,9 @@
 import os
-import ast
+import asyncio
+import json
+import hashlib
+import pickle
+from functools import lru_cache
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
@@ -8,11 +12,12 @@ from typing import List, Dict, Any
 from dotenv import load_dotenv
 
 # LangChain imports
+from langchain.retrievers import EnsembleRetriever
 from langchain_community.document_loaders import TextLoader
+from langchain_community.retrievers import BM25Retriever
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
 from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings
 
@@ -30,10 +35,27 @@ templates = Jinja2Templates(directory="templates")
 # --- Global Variables & Constants ---
 KNOWLEDGE_BASE_PATH = 'university_guide.md'
 # Define a persistent directory for the admissions DB
-ADMISSIONS_DB_DIR = "admissions_chroma_db" 
+ADMISSIONS_DB_DIR = "admissions_chroma_db"
 vector_store_retriever = None
 is_rag_initialized = False
 
+ADMISSIONS_TEMPLATE = """
+You are an expert admissions assistant for Siddhartha Academy of Higher Education.
+Your goal is to answer questions accurately based on the provided context.
+If the context doesn't contain the answer, state that you don't have enough information.
+Answer in a clear, friendly, and helpful tone. Format lists or steps clearly if needed.
+
+Context:
+{context}
+
+Question:
+{question}
+
+Answer:
+"""
+ADMISSIONS_PROMPT = ChatPromptTemplate.from_template(ADMISSIONS_TEMPLATE)
+_rag_chain = None
+
 # --- Pydantic Models for Request/Response ---
 class AskRequest(BaseModel):
     question: str
@@ -43,6 +65,25 @@ class AskResponse(BaseModel):
     answer: str
     suggested_questions: List[str]
 
+@lru_cache(maxsize=4)
+def get_llm(model: str, temperature: float, json_list_output: bool = False) -> ChatGoogleGenerativeAI:
+    """
+    Returns a cached LLM client for the given model/temperature pair.
+
+    Building ChatGoogleGenerativeAI involves HTTP session setup and
+    credential validation, so the instances are reused across requests.
+    With `json_list_output`, the client enforces a JSON array-of-strings
+    response schema server-side.
+    """
+    if json_list_output:
+        return ChatGoogleGenerativeAI(
+            model=model, temperature=temperature, google_api_key=GOOGLE_API_KEY,
+            response_mime_type="application/json",
+            response_schema={"type": "array", "items": {"type": "string"}, "maxItems": 4}
+        )
+    return ChatGoogleGenerativeAI(model=model, temperature=temperature, google_api_key=GOOGLE_API_KEY)
+
+
 # --- Helper Functions (unchanged) ---
 def get_default_questions():
     """Returns a list of default questions."""
@@ -54,8 +95,13 @@ def get_default_questions():
         'How do I apply for a Ph.D.?'
     ]
 
-def generate_followup_questions(chat_history: List[Dict[str, str]]):
-    """Generates context-aware follow-up questions."""
+def generate_followup_questions(chat_history: List[Dict[str, str]], relevant_docs=None):
+    """
+    Generates context-aware follow-up questions.
+
+    Accepts pre-retrieved documents so callers that already ran retrieval
+    for the answer don't pay for a second embedding + vector store query.
+    """
     if not chat_history or not vector_store_retriever:
         return get_default_questions()
 
@@ -64,30 +110,27 @@ def generate_followup_questions(chat_history: List[Dict[str, str]]):
     if not last_user_message:
         return get_default_questions()
 
-    relevant_docs = vector_store_retriever.get_relevant_documents(last_user_message)
+    if relevant_docs is None:
+        relevant_docs = vector_store_retriever.get_relevant_documents(last_user_message)
     context = "\n\n".join([doc.page_content for doc in relevant_docs])
 
     prompt_template = f"""
     Based on the provided context from a university admissions guide, suggest 4 short, relevant follow-up questions a prospective student might ask next.
-    CRITICAL: The questions MUST be answerable using ONLY the information in the context below. Do not suggest questions if the answer is not in the text.
-    Return ONLY a Python-parseable list of strings. For example: ["Question 1?", "Question 2?", "Question 3?", "Question 4?"]
+    The questions MUST be answerable using ONLY the information in the context below.
 
     Context:
     ---
     {context}
     ---
-
-    Suggested Questions (Python list of strings):
     """
     try:
-        llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-preview-05-20", temperature=0.6, google_api_key=GOOGLE_API_KEY)
+        llm = get_llm("gemini-2.5-flash-preview-05-20", 0.6, json_list_output=True)
         response = llm.invoke(prompt_template)
-        # Safely evaluate the string to a Python list
-        suggested_questions = ast.literal_eval(response.content)
+        suggested_questions = json.loads(response.content)
         if isinstance(suggested_questions, list) and all(isinstance(q, str) for q in suggested_questions):
             return suggested_questions
         return get_default_questions()
-    except (ValueError, SyntaxError, TypeError) as e:
+    except (json.JSONDecodeError, TypeError) as e:
         print(f"Error parsing LLM response for follow-up questions: {e}")
         return get_default_questions()
     except Exception as e:
@@ -95,6 +138,36 @@ def generate_followup_questions(chat_history: List[Dict[str, str]]):
         return get_default_questions()
 
 
+def load_knowledge_base_splits():
+    """
+    Loads the split knowledge-base documents, using an on-disk cache.
+
+    The splits are deterministic for a given knowledge-base file, so they are
+    pickled next to the Chroma directory keyed by the file's content hash.
+    Warm restarts load the cached splits instead of re-running the splitter;
+    editing the knowledge base changes the hash and forces a fresh split.
+    """
+    with open(KNOWLEDGE_BASE_PATH, 'rb') as f:
+        content_hash = hashlib.blake2b(f.read()).hexdigest()
+    cache_path = os.path.join(ADMISSIONS_DB_DIR, f"splits_{content_hash}.pkl")
+
+    if os.path.exists(cache_path):
+        print(f"Loading cached document splits from '{cache_path}'...")
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+
+    loader = TextLoader(KNOWLEDGE_BASE_PATH, encoding='utf-8')
+    docs = loader.load()
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    splits = text_splitter.split_documents(docs)
+
+    os.makedirs(ADMISSIONS_DB_DIR, exist_ok=True)
+    with open(cache_path, 'wb') as f:
+        pickle.dump(splits, f)
+    print(f"Document splits cached to '{cache_path}'.")
+    return splits
+
+
 # --- Core RAG Logic (MODIFIED FOR PERSISTENCE) ---
 def initialize_rag_chain():
     """
@@ -110,11 +183,16 @@ def initialize_rag_chain():
         # not just the directory, to ensure the DB is populated.
         db_file_path = os.path.join(ADMISSIONS_DB_DIR, "chroma.sqlite3")
 
+        if not os.path.exists(KNOWLEDGE_BASE_PATH):
+            print(f"ERROR: Knowledge base file not found at: {KNOWLEDGE_BASE_PATH}")
+            is_rag_initialized = False
+            return
+
+        splits = load_knowledge_base_splits()
+
         if os.path.exists(db_file_path):
             # Load the existing database from disk
             print(f"Loading existing admissions vector store from '{ADMISSIONS_DB_DIR}'...")
-            
-            # --- ADD THESE 4 LINES ---
             vector_store = Chroma(
                 persist_directory=ADMISSIONS_DB_DIR,
                 embedding_function=embeddings
@@ -123,16 +201,6 @@ def initialize_rag_chain():
         else:
             # Create and persist the database if it doesn't exist
             print(f"Admissions vector store not found. Creating a new one from '{KNOWLEDGE_BASE_PATH}'...")
-            if not os.path.exists(KNOWLEDGE_BASE_PATH):
-                print(f"ERROR: Knowledge base file not found at: {KNOWLEDGE_BASE_PATH}")
-                is_rag_initialized = False
-                return
-
-            loader = TextLoader(KNOWLEDGE_BASE_PATH, encoding='utf-8')
-            docs = loader.load()
-            text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-            splits = text_splitter.split_documents(docs)
-
             vector_store = Chroma.from_documents(
                 documents=splits,
                 embedding=embeddings,
@@ -140,7 +208,16 @@ def initialize_rag_chain():
             )
             print(f"New vector store created and saved to '{ADMISSIONS_DB_DIR}'.")
 
-        vector_store_retriever = vector_store.as_retriever()
+        # Hybrid retrieval: dense similarity catches paraphrases while BM25
+        # over the same splits covers keyword-heavy questions (course codes,
+        # program names) that embeddings tend to miss.
+        dense_retriever = vector_store.as_retriever(search_kwargs={'k': 6})
+        bm25_retriever = BM25Retriever.from_documents(splits)
+        bm25_retriever.k = 6
+        vector_store_retriever = EnsembleRetriever(
+            retrievers=[dense_retriever, bm25_retriever],
+            weights=[0.6, 0.4]
+        )
         is_rag_initialized = True
         print("RAG chain initialized successfully.")
 
@@ -148,35 +225,25 @@ def initialize_rag_chain():
         print(f"Error initializing RAG chain: {e}")
         is_rag_initialized = False
 
-def get_rag_response(question: str):
-    """Generates a response from the RAG chain."""
+def get_rag_response(question: str, context_docs=None):
+    """
+    Generates a response from the RAG chain.
+
+    When `context_docs` is given, the retrieval step is skipped and the
+    provided documents are used as context directly.
+    """
     if not is_rag_initialized or not vector_store_retriever:
         return "The knowledge base is not yet initialized. Please make sure university_guide.md exists and restart the server."
 
-    template = """
-    You are an expert admissions assistant for Siddhartha Academy of Higher Education.
-    Your goal is to answer questions accurately based on the provided context.
-    If the context doesn't contain the answer, state that you don't have enough information.
-    Answer in a clear, friendly, and helpful tone. Format lists or steps clearly if needed.
-
-    Context:
-    {context}
-
-    Question:
-    {question}
-
-    Answer:
-    """
-    prompt = ChatPromptTemplate.from_template(template)
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash-preview-05-20", temperature=0.7, google_api_key=GOOGLE_API_KEY)
-    rag_chain = (
-        {"context": vector_store_retriever, "question": RunnablePassthrough()}
-        | prompt
-        | llm
-        | StrOutputParser()
-    )
+    global _rag_chain
+    if _rag_chain is None:
+        _rag_chain = ADMISSIONS_PROMPT | get_llm("gemini-2.5-flash-preview-05-20", 0.7) | StrOutputParser()
+    rag_chain = _rag_chain
     try:
-        answer = rag_chain.invoke(question)
+        if context_docs is None:
+            context_docs = vector_store_retriever.get_relevant_documents(question)
+        context = "\n\n".join([doc.page_content for doc in context_docs])
+        answer = rag_chain.invoke({"context": context, "question": question})
         return answer
     except Exception as e:
         print(f"Error invoking RAG chain: {e}")
@@ -206,15 +273,18 @@ async def ask_question(payload: AskRequest):
             }
         )
 
-    ai_response = get_rag_response(payload.question)
-    
-    # Append current exchange to history for generating next suggestions
+    # Retrieve once, then generate the answer and the follow-up questions
+    # concurrently — both only need the question and the retrieved docs.
+    context_docs = await asyncio.to_thread(
+        vector_store_retriever.get_relevant_documents, payload.question
+    )
     current_chat_history = payload.chat_history + [
-        {'type': 'user', 'message': payload.question},
-        {'type': 'ai', 'message': ai_response}
+        {'type': 'user', 'message': payload.question}
     ]
-    
-    suggested_questions = generate_followup_questions(current_chat_history)
+    ai_response, suggested_questions = await asyncio.gather(
+        asyncio.to_thread(get_rag_response, payload.question, context_docs),
+        asyncio.to_thread(generate_followup_questions, current_chat_history, context_docs)
+    )
     
     return AskResponse(answer=ai_response, suggested_questions=suggested_questions)
 
@@ -226,4 +296,26 @@ async def startup_event():
     """
     print("Application startup...")
     # The check for the knowledge base file is now inside initialize_rag_chain
-    initialize_rag_chain()
\ No newline at end of file
+    initialize_rag_chain()
+
+if __name__ == "__main__":
+    import uvicorn
+    # Build the split cache and Chroma index once, before any worker
+    # starts: Chroma doesn't support concurrent multi-process writes, and
+    # N workers racing Chroma.from_documents into the same persist
+    # directory would permanently duplicate every split. With the
+    # artifacts on disk, each worker's startup takes the warm load path.
+    initialize_rag_chain()
+    # uvloop + httptools (bundled with uvicorn[standard]) roughly double raw
+    # request throughput for I/O-bound endpoints; one worker per core. Each
+    # worker initializes its own RAG chain but shares the on-disk Chroma index.
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        loop="uvloop",
+        http="httptools",
+        limit_concurrency=1000,
+        timeout_keep_alive=30
+    )
\ No newline at end of file
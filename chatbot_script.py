@@ -7,22 +7,192 @@ The chatbot uses a Retrieval-Augmented Generation (RAG) approach with
 Google's Gemini model, SentenceTransformers for embeddings, and ChromaDB
 for vector storage.
 """
+import hashlib
 import json
 import re
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 
 import google.generativeai as genai
+import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 import chromadb
 from dotenv import load_dotenv
 import warnings
 
+# Optional: orjson decodes large JSON files several times faster than the
+# stdlib; fall back to json when it is not installed.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: pyahocorasick matches all concept keywords in one linear pass
+# over the query; fall back to a per-concept substring scan without it.
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional: ONNX Runtime INT8 path for the embedder. Falls back to the
+# regular SentenceTransformer when optimum/onnxruntime are not installed.
+try:
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 # Load environment variables from a .env file
 load_dotenv()
 
 warnings.filterwarnings('ignore')
 
+EMBEDDING_MODEL_ID = 'sentence-transformers/all-MiniLM-L6-v2'
+ONNX_MODEL_DIR = './onnx_minilm_int8'
+CHROMA_DB_PATH = './chroma_db_by_dept'
+
+# When CHROMA_SERVER_HOST is set, talk to a standalone Chroma server
+# (e.g. `chroma run --path ./chroma_db_by_dept`) instead of embedding the
+# database in this process. That keeps vector store I/O out of the API
+# workers and lets several of them share one index.
+CHROMA_SERVER_HOST = os.environ.get('CHROMA_SERVER_HOST')
+CHROMA_SERVER_PORT = int(os.environ.get('CHROMA_SERVER_PORT', '8001'))
+
+# Semantic query cache: answers are reused for near-duplicate questions whose
+# embeddings are within this cosine similarity of a previously answered one.
+SEMANTIC_CACHE_SIMILARITY = 0.93
+SEMANTIC_CACHE_MAX_ENTRIES = 512
+
+# Query-enhancement patterns, compiled once at import
+_SEM_RE = re.compile(r'\bsem(?:ester)?\s*(\d+)\b')
+_COURSE_CODE_RE = re.compile(r'\b\d{2}[A-Z&]{2,}\d{4}[A-Z]?\b')
+
+# Prompt selection for generate_enhanced_response: a query gets the focused
+# syllabus prompt only when it mentions 'syllabus' and none of these topics.
+_WORD_RE = re.compile(r'[a-z]+')
+_SYLLABUS_EXCLUDE = frozenset({
+    'book', 'books', 'textbook', 'textbooks',
+    'reference', 'references', 'overview', 'credit', 'credits',
+    'outcome', 'outcomes', 'prerequisite', 'prerequisites'
+})
+
+_GENERAL_PROMPT_TMPL = """You are a precise and helpful academic assistant for a university syllabus. Your task is to answer the student's question concisely based ONLY on the provided context.
+
+        Context Information:
+        ---
+        {context_text}
+        ---
+
+        Student's Question: {query}
+
+        Instructions:
+        1. Synthesize a coherent, friendly answer from the provided context. Do not just list the raw snippets.
+        2. If the context contains a list of courses, present them clearly in a list format.
+        3. If specific details like textbooks, prerequisites, or outcomes are available in the context, integrate them naturally into your response.
+        4. If the information to answer the question is NOT in the context, you MUST explicitly state that you cannot find the information in the provided documents.
+        5. Be direct and clear in your response.
+
+        Answer:"""
+
+_SYLLABUS_PROMPT_TMPL = """You are a precise academic assistant. A student is asking specifically for the syllabus for a course. Based ONLY on the provided context, answer their question.
+
+            Context Information:
+            ---
+            {context_text}
+            ---
+
+            Student's Question: {query}
+
+            Instructions:
+            1. Find the syllabus units and topics in the context.
+            2. List ONLY the syllabus units with their topics. Format them clearly with unit numbers and titles.
+            3. CRITICAL: Do NOT include the Course Overview, prerequisites, course outcomes, credits, or book recommendations in your answer.
+            4. If the syllabus unit information is not available in the context, explicitly state that.
+
+            Answer:"""
+
+
+class QuantizedMiniLMEncoder:
+    """
+    INT8-quantized MiniLM embedder running under ONNX Runtime.
+
+    Exports the sentence-transformer to ONNX with dynamic INT8 quantization
+    on first use (cached on disk afterwards) and exposes an `encode` method
+    compatible with the subset of the SentenceTransformer API this module uses.
+    """
+
+    def __init__(self):
+        if not os.path.isdir(ONNX_MODEL_DIR):
+            model = ORTModelForFeatureExtraction.from_pretrained(EMBEDDING_MODEL_ID, export=True)
+            quantizer = ORTQuantizer.from_pretrained(model)
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False)
+            quantizer.quantize(save_dir=ONNX_MODEL_DIR, quantization_config=qconfig)
+        self.tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL_ID)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            ONNX_MODEL_DIR, provider='CPUExecutionProvider'
+        )
+
+    def encode(self, sentences, batch_size=32, show_progress_bar=False,
+               convert_to_numpy=True, normalize_embeddings=False):
+        """Embeds a list of sentences, returning a (N, 384) numpy array."""
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        embeddings = []
+        for i in range(0, len(sentences), batch_size):
+            batch = sentences[i:i + batch_size]
+            inputs = self.tokenizer(batch, padding=True, truncation=True,
+                                    max_length=256, return_tensors='np')
+            outputs = self.model(**inputs)
+            token_embeddings = outputs.last_hidden_state
+            # Mean pooling over non-padding tokens
+            mask = np.expand_dims(inputs['attention_mask'], axis=-1).astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            counts = np.clip(mask.sum(axis=1), a_min=1e-9, a_max=None)
+            embeddings.append(summed / counts)
+        result = np.concatenate(embeddings, axis=0)
+        if normalize_embeddings:
+            norms = np.linalg.norm(result, axis=1, keepdims=True)
+            result = result / np.clip(norms, a_min=1e-9, a_max=None)
+        return result
+
+
+def _load_json_file(path: str):
+    """Decodes a JSON file, preferring orjson when available."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _build_chroma_client():
+    """Returns an HttpClient when a Chroma server is configured, else a PersistentClient."""
+    if CHROMA_SERVER_HOST:
+        print(f"Connecting to Chroma server at {CHROMA_SERVER_HOST}:{CHROMA_SERVER_PORT}...")
+        return chromadb.HttpClient(host=CHROMA_SERVER_HOST, port=CHROMA_SERVER_PORT)
+    return chromadb.PersistentClient(path=CHROMA_DB_PATH)
+
+
+def _build_embedding_model():
+    """Returns the INT8 ONNX encoder when available, else the FP32 PyTorch one."""
+    if ONNX_AVAILABLE:
+        try:
+            return QuantizedMiniLMEncoder()
+        except Exception as e:
+            print(f"Warning: could not build quantized ONNX encoder ({e}). "
+                  f"Falling back to SentenceTransformer.")
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    model = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+    if device == 'cuda':
+        # FP16 halves memory traffic and roughly doubles encode throughput;
+        # embeddings are cast back to FP32 before they reach Chroma.
+        model.half()
+    return model
+
 
 class EnhancedSyllabusRAGChatbot:
     """
@@ -42,17 +212,36 @@ class EnhancedSyllabusRAGChatbot:
         """
         genai.configure(api_key=gemini_api_key)
         self.model = genai.GenerativeModel(model_name)
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.client = chromadb.PersistentClient(path="./chroma_db_by_dept")
+        self.embedding_model = _build_embedding_model()
+        self.client = _build_chroma_client()
         self.collection = None
+        self.query_cache = None
+        self._qcache_ids = []  # insertion order, oldest first, for LRU eviction
+        self._qcache_counter = 0
 
         # Data stores
         self.chunks_data = []
         self.faq_data = []
         self.concept_mapping = {}
+        self._concept_terms = []  # (lowercased concept, courses), built in load_data
+        self._concept_aho = None  # Aho-Corasick automaton over concept keywords
         self.course_details = {}
         self.semester_course_map = {}
 
+        # Struct-of-arrays view over course metadata: parallel columns plus a
+        # code -> index map, so hot paths do index lookups instead of chasing
+        # nested dicts.
+        self._codes: List[str] = []
+        self._names: List[str] = []
+        self._sems: List[str] = []
+        self._categories: List[str] = []
+        self._code_to_idx: Dict[str, int] = {}
+
+        # Document-embedding cache keyed by content hash, persisted next to
+        # the department's data files so restarts only encode changed docs.
+        self._emb_cache: Dict[str, Any] = {}
+        self._emb_cache_path: Optional[str] = None
+
     def load_data(self, syllabus_data_path: str, optimization_path: str):
         """
         Loads and processes syllabus and optimization data from JSON files.
@@ -61,8 +250,9 @@ class EnhancedSyllabusRAGChatbot:
             syllabus_data_path (str): Path to the main syllabus data file.
             optimization_path (str): Path to the RAG optimization data file (e.g., FAQs).
         """
-        with open(syllabus_data_path, 'r', encoding='utf-8') as f:
-            restructured_data = json.load(f)
+        self._emb_cache_path = os.path.join(os.path.dirname(syllabus_data_path), 'emb_cache.npz')
+
+        restructured_data = _load_json_file(syllabus_data_path)
 
         self.course_details = {course['metadata']['course_code']: course for course in restructured_data}
 
@@ -75,6 +265,12 @@ class EnhancedSyllabusRAGChatbot:
                 continue
 
             semester = str(semester)
+            self._code_to_idx[course_code] = len(self._codes)
+            self._codes.append(course_code)
+            self._names.append(course_name)
+            self._sems.append(semester)
+            self._categories.append(metadata.get('category', 'N/A'))
+
             if semester not in self.semester_course_map:
                 self.semester_course_map[semester] = []
 
@@ -124,17 +320,72 @@ class EnhancedSyllabusRAGChatbot:
 
         # Load optimization data (FAQs, etc.)
         try:
-            with open(optimization_path, 'r', encoding='utf-8') as f:
-                optimization_data = json.load(f)
-                self.faq_data = optimization_data.get('faq_dataset', [])
-                self.concept_mapping = optimization_data.get('concept_mapping', {})
+            optimization_data = _load_json_file(optimization_path)
+            self.faq_data = optimization_data.get('faq_dataset', [])
+            self.concept_mapping = optimization_data.get('concept_mapping', {})
         except FileNotFoundError:
             print(f"Warning: Optimization file not found at {optimization_path}. Running without it.")
             self.faq_data = []
             self.concept_mapping = {}
 
+        # Lowercase the concept keys once so enhance_query doesn't per-query
+        self._concept_terms = [(concept.lower(), courses)
+                               for concept, courses in self.concept_mapping.items()]
+
+        # Build the Aho-Corasick automaton over the concept keywords so each
+        # query is scanned once regardless of how many concepts are mapped.
+        self._concept_aho = None
+        if ahocorasick is not None and self._concept_terms:
+            automaton = ahocorasick.Automaton()
+            for concept_lower, courses in self._concept_terms:
+                automaton.add_word(concept_lower, (concept_lower, courses))
+            automaton.make_automaton()
+            self._concept_aho = automaton
+
         print(f"Loaded data for {len(self.course_details)} courses and {len(self.faq_data)} FAQ entries.")
 
+    def _load_embedding_cache(self):
+        """Loads the persisted content-hash -> embedding cache, if present."""
+        self._emb_cache = {}
+        if self._emb_cache_path and os.path.exists(self._emb_cache_path):
+            try:
+                with np.load(self._emb_cache_path) as data:
+                    self._emb_cache = {key: data[key] for key in data.files}
+                print(f"Loaded {len(self._emb_cache)} cached embeddings from '{self._emb_cache_path}'.")
+            except Exception as e:
+                print(f"Warning: could not load embedding cache: {e}")
+
+    def _save_embedding_cache(self):
+        """Persists the embedding cache for the next restart."""
+        if self._emb_cache_path and self._emb_cache:
+            try:
+                np.savez(self._emb_cache_path, **self._emb_cache)
+            except Exception as e:
+                print(f"Warning: could not save embedding cache: {e}")
+
+    def _encode_batch(self, docs: List[str]):
+        """
+        Encodes one ingest batch into a normalized numpy embedding matrix.
+
+        Documents whose content hash is already in the embedding cache are
+        served from it; only cache misses hit the encoder.
+        """
+        hashes = [hashlib.blake2b(doc.encode('utf-8')).hexdigest() for doc in docs]
+        missing = [i for i, h in enumerate(hashes) if h not in self._emb_cache]
+        if missing:
+            encoded = self.embedding_model.encode(
+                [docs[i] for i in missing],
+                batch_size=256,
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+            # Chroma's HNSW index expects FP32, even when the encoder runs FP16
+            encoded = np.asarray(encoded, dtype=np.float32)
+            for row, i in enumerate(missing):
+                self._emb_cache[hashes[i]] = encoded[row]
+        return np.stack([self._emb_cache[h] for h in hashes])
+
     def create_enhanced_vector_store(self, collection_name: str):
         """
         Creates a fresh ChromaDB vector store for the loaded data.
@@ -155,6 +406,19 @@ class EnhancedSyllabusRAGChatbot:
             metadata={"hnsw:space": "cosine"}
         )
 
+        # Fresh semantic query cache alongside the main collection
+        qcache_name = f"{collection_name}_qcache"
+        try:
+            self.client.delete_collection(name=qcache_name)
+        except Exception:
+            pass
+        self.query_cache = self.client.create_collection(
+            name=qcache_name,
+            metadata={"hnsw:space": "cosine"}
+        )
+        self._qcache_ids = []
+        self._qcache_counter = 0
+
         documents, metadatas, ids = [], [], []
 
         # Process syllabus chunks
@@ -180,14 +444,32 @@ class EnhancedSyllabusRAGChatbot:
             metadatas.append({'category': faq.get('category', 'general'), 'chunk_type': 'faq', 'source': 'faq'})
             ids.append(f"faq_{i}")
 
-        # Add all documents to ChromaDB in batches
-        batch_size = 100
-        for i in range(0, len(documents), batch_size):
-            batch_docs = documents[i:i + batch_size]
-            batch_meta = metadatas[i:i + batch_size]
-            batch_ids = ids[i:i + batch_size]
-            embeddings = self.embedding_model.encode(batch_docs).tolist()
-            self.collection.add(embeddings=embeddings, documents=batch_docs, metadatas=batch_meta, ids=batch_ids)
+        self._load_embedding_cache()
+
+        # Encode and ingest in 250-doc batches, overlapping the encode of the
+        # next batch with the Chroma add of the current one. Futures are
+        # consumed in submit order so insertion order is preserved.
+        batch_size = 250
+        batches = [
+            (documents[i:i + batch_size], metadatas[i:i + batch_size], ids[i:i + batch_size])
+            for i in range(0, len(documents), batch_size)
+        ]
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            encode_futures = [
+                executor.submit(self._encode_batch, batch_docs)
+                for batch_docs, _, _ in batches
+            ]
+            for (batch_docs, batch_meta, batch_ids), future in zip(batches, encode_futures):
+                # Chroma accepts numpy arrays directly; no need to materialize
+                # a nested Python list per batch.
+                self.collection.add(
+                    embeddings=future.result(),
+                    documents=batch_docs,
+                    metadatas=batch_meta,
+                    ids=batch_ids
+                )
+
+        self._save_embedding_cache()
         print(f"Successfully created and populated vector store '{collection_name}' with {len(documents)} documents.")
 
 
@@ -203,43 +485,55 @@ class EnhancedSyllabusRAGChatbot:
         """
         enhanced_terms = []
         query_lower = query.lower()
+        query_upper = query.upper()
         # Enhance with course names if a semester is mentioned
-        sem_match = re.search(r'\bsem(?:ester)?\s*(\d+)\b', query_lower)
+        sem_match = _SEM_RE.search(query_lower)
         if sem_match:
             sem_num = sem_match.group(1)
             if sem_num in self.semester_course_map:
                 course_names = [c['course_name'] for c in self.semester_course_map[sem_num]]
                 enhanced_terms.extend(course_names)
         # Enhance with course name if a course code is mentioned
-        course_code_pattern = re.search(r'\b\d{2}[A-Z&]{2,}\d{4}[A-Z]?\b', query.upper())
+        course_code_pattern = _COURSE_CODE_RE.search(query_upper)
         if course_code_pattern:
-            course_code = course_code_pattern.group()
-            if course_code in self.course_details:
-                course_name = self.course_details[course_code]['metadata'].get('course_name', '')
-                enhanced_terms.append(course_name)
+            idx = self._code_to_idx.get(course_code_pattern.group())
+            if idx is not None:
+                enhanced_terms.append(self._names[idx])
         # Enhance based on predefined concept mappings
-        for concept, courses in self.concept_mapping.items():
-            if concept.lower() in query_lower:
-                enhanced_terms.extend(courses[:2])
+        if self._concept_aho is not None:
+            matched = set()
+            for _, (concept_lower, courses) in self._concept_aho.iter(query_lower):
+                if concept_lower not in matched:
+                    matched.add(concept_lower)
+                    enhanced_terms.extend(courses[:2])
+        else:
+            for concept_lower, courses in self._concept_terms:
+                if concept_lower in query_lower:
+                    enhanced_terms.extend(courses[:2])
         return f"{query} {' '.join(enhanced_terms)}" if enhanced_terms else query
 
-    def retrieve_context(self, query: str, n_results: int = 8) -> List[Dict]:
+    def retrieve_context(self, query: str, n_results: int = 8, query_embedding=None) -> List[Dict]:
         """
         Retrieves relevant context documents from the vector store.
 
         Args:
             query (str): The user's query.
             n_results (int): The number of context documents to retrieve.
+            query_embedding: Optional precomputed embedding of the (enhanced)
+                query; when given, the query is not encoded again.
 
         Returns:
             List[Dict]: A list of retrieved documents with metadata and distance scores.
         """
         if not self.collection:
             raise ValueError("Vector store not initialized.")
-        enhanced_query = self.enhance_query(query)
-        query_embedding = self.embedding_model.encode([enhanced_query]).tolist()
+        if query_embedding is None:
+            enhanced_query = self.enhance_query(query)
+            query_embedding = self.embedding_model.encode(
+                [enhanced_query], convert_to_numpy=True, normalize_embeddings=True
+            )
         results = self.collection.query(
-            query_embeddings=query_embedding,
+            query_embeddings=query_embedding.tolist(),
             n_results=n_results,
             include=['documents', 'metadatas', 'distances']
         )
@@ -262,45 +556,13 @@ class EnhancedSyllabusRAGChatbot:
             for doc in context_docs
         ]
         context_text = "\n---\n".join(context_parts)
-        
-        # Default prompt for general queries
-        prompt = f"""You are a precise and helpful academic assistant for a university syllabus. Your task is to answer the student's question concisely based ONLY on the provided context.
-
-        Context Information:
-        ---
-        {context_text}
-        ---
-
-        Student's Question: {query}
-
-        Instructions:
-        1. Synthesize a coherent, friendly answer from the provided context. Do not just list the raw snippets.
-        2. If the context contains a list of courses, present them clearly in a list format.
-        3. If specific details like textbooks, prerequisites, or outcomes are available in the context, integrate them naturally into your response.
-        4. If the information to answer the question is NOT in the context, you MUST explicitly state that you cannot find the information in the provided documents.
-        5. Be direct and clear in your response.
-
-        Answer:"""
 
         # If the user specifically asks for the "syllabus", use a more focused prompt.
-        query_lower = query.lower()
-        if 'syllabus' in query_lower and not any(keyword in query_lower for keyword in ['book', 'overview', 'credit', 'outcome', 'prerequisite']):
-            prompt = f"""You are a precise academic assistant. A student is asking specifically for the syllabus for a course. Based ONLY on the provided context, answer their question.
-
-            Context Information:
-            ---
-            {context_text}
-            ---
-
-            Student's Question: {query}
-
-            Instructions:
-            1. Find the syllabus units and topics in the context.
-            2. List ONLY the syllabus units with their topics. Format them clearly with unit numbers and titles.
-            3. CRITICAL: Do NOT include the Course Overview, prerequisites, course outcomes, credits, or book recommendations in your answer.
-            4. If the syllabus unit information is not available in the context, explicitly state that.
-
-            Answer:"""
+        query_tokens = set(_WORD_RE.findall(query.lower()))
+        if 'syllabus' in query_tokens and _SYLLABUS_EXCLUDE.isdisjoint(query_tokens):
+            prompt = _SYLLABUS_PROMPT_TMPL.format(context_text=context_text, query=query)
+        else:
+            prompt = _GENERAL_PROMPT_TMPL.format(context_text=context_text, query=query)
 
         try:
             response = self.model.generate_content(prompt)
@@ -311,22 +573,80 @@ class EnhancedSyllabusRAGChatbot:
                 return "Sorry, there is an issue with the server's API key configuration. Please contact the administrator."
             return f"Sorry, I encountered an error generating the response: {error_message}"
 
+    def _check_semantic_cache(self, query_embedding) -> Optional[Dict[str, Any]]:
+        """Returns a cached answer dict when a near-duplicate query was already answered."""
+        if not self.query_cache or self.query_cache.count() == 0:
+            return None
+        try:
+            results = self.query_cache.query(
+                query_embeddings=query_embedding.tolist(),
+                n_results=1,
+                include=['documents', 'distances']
+            )
+        except Exception as e:
+            print(f"Warning: semantic cache lookup failed: {e}")
+            return None
+        if not results['documents'] or not results['documents'][0]:
+            return None
+        # Cosine distance = 1 - similarity
+        if results['distances'][0][0] <= 1 - SEMANTIC_CACHE_SIMILARITY:
+            return json.loads(results['documents'][0][0])
+        return None
+
+    def _store_semantic_cache(self, query_embedding, result: Dict[str, Any]):
+        """Stores an answered query in the cache, evicting the oldest entry when full."""
+        if not self.query_cache:
+            return
+        try:
+            if len(self._qcache_ids) >= SEMANTIC_CACHE_MAX_ENTRIES:
+                oldest = self._qcache_ids.pop(0)
+                self.query_cache.delete(ids=[oldest])
+            entry_id = f"qcache_{self._qcache_counter}"
+            self._qcache_counter += 1
+            self.query_cache.add(
+                embeddings=query_embedding.tolist(),
+                documents=[json.dumps(result)],
+                ids=[entry_id]
+            )
+            self._qcache_ids.append(entry_id)
+        except Exception as e:
+            print(f"Warning: could not store answer in semantic cache: {e}")
+
     def chat(self, query: str, n_context: int = 10) -> Dict[str, Any]:
         """
         Orchestrates the chat process from query to response.
+
+        Near-duplicate questions are served from the semantic query cache
+        without a retrieval or generation round-trip. The enhanced query is
+        embedded exactly once and shared between the cache lookup and retrieval.
         """
-        context_docs = self.retrieve_context(query, n_context)
+        enhanced_query = self.enhance_query(query)
+        query_embedding = self.embedding_model.encode(
+            [enhanced_query], convert_to_numpy=True, normalize_embeddings=True
+        )
+        cached = self._check_semantic_cache(query_embedding)
+        if cached is not None:
+            return cached
+
+        context_docs = self.retrieve_context(query, n_context, query_embedding=query_embedding)
         response = self.generate_enhanced_response(query, context_docs)
-        relevant_courses = sorted(list(set(
-            f"{doc['metadata'].get('course_code')} - {doc['metadata'].get('course_name')}"
-            for doc in context_docs if doc['metadata'].get('course_code')
-        )))
-        return {
+        # Single pass: skip docs without a code, dedup by code, format once.
+        seen: Dict[str, str] = {}
+        for doc in context_docs:
+            code = doc['metadata'].get('course_code')
+            if not code or code in seen:
+                continue
+            idx = self._code_to_idx.get(code)
+            seen[code] = self._names[idx] if idx is not None else doc['metadata'].get('course_name', '')
+        relevant_courses = [f"{code} - {name}" for code, name in sorted(seen.items())]
+        result = {
             'query': query,
             'answer': response,
             'context_used': len(context_docs),
             'relevant_courses': relevant_courses
         }
+        self._store_semantic_cache(query_embedding, result)
+        return result
 
 def setup_enhanced_chatbot(gemini_api_key: str, department: str, regulation: Optional[str] = None, data_root: str = "data"):
     """
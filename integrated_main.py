@@ -1,14 +1,20 @@
+import asyncio
 import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, List, Dict
+from cachetools import LRUCache, TTLCache
 from dotenv import load_dotenv
 
 # Import from your existing modules
 from chatbot_script import setup_enhanced_chatbot
+from placements_data import get_placements_df, reload_placements_df
 import app as admissions_app
 
 # --- Placements Bot Imports ---
@@ -23,19 +29,29 @@ load_dotenv()
 app = FastAPI(
     title="Unified University Chatbot System",
     description="An integrated chatbot for admissions, courses, and placements.",
-    version="3.1.0"
+    version="3.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Serve static files (like logo.png)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-# Configure CORS
+# Configure CORS. Explicit origins, no credentials, and a minimal
+# method/header list let the middleware fast-path non-CORS requests
+# instead of inspecting and echoing the Origin on every one.
+ALLOWED_ORIGINS = [
+    origin.strip()
+    for origin in os.environ.get(
+        "ALLOWED_ORIGINS", "http://localhost:8000,http://localhost:3000"
+    ).split(",")
+    if origin.strip()
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=ALLOWED_ORIGINS,
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
 )
 
 # --- Request Models ---
@@ -52,8 +68,49 @@ class PlacementsQuery(BaseModel):
     query: str
 
 # --- Global Variables ---
-course_chatbots = {}
+# Loaded course chatbots, least-recently-used out first: each entry holds a
+# full embedding model + vector store, so an unbounded dict would grow RSS
+# with every (department, regulation) pair ever requested.
+course_chatbots = LRUCache(maxsize=16)
+_chatbot_locks: Dict[str, asyncio.Lock] = {}  # one lock per cache key, guards cold loads
+_course_chat_semaphore = asyncio.Semaphore(32)  # cap on concurrent course LLM calls
 placements_agent = None  # Agent for the placements bot
+placements_df = None  # Shared DataFrame behind the agent and the intent router
+placements_stats = None  # Precomputed aggregates, rebuilt on (re)load
+INDEX_HTML = None  # integrated_chat.html, read once at startup
+
+
+@dataclass
+class PlacementStats:
+    """Aggregates the intent handlers would otherwise recompute per query."""
+    total_records: int
+    unique_students: int
+    unique_companies: int
+    avg_package: float
+    company_counts: "pd.Series"
+    student_counts: "pd.Series"
+    year_counts: "pd.Series"
+    max_package_row: "pd.Series"
+
+
+def _compute_placement_stats(df) -> PlacementStats:
+    return PlacementStats(
+        total_records=len(df),
+        unique_students=df['roll_no'].nunique(),
+        unique_companies=df['company_name'].nunique(),
+        avg_package=df['pay_package_lpa'].mean(),
+        company_counts=df['company_name'].value_counts(),
+        student_counts=df['roll_no'].value_counts(),
+        year_counts=df.groupby('academic_year').size(),
+        max_package_row=df.loc[df['pay_package_lpa'].idxmax()]
+    )
+
+# Agent answers keyed by normalized query; repeats cost zero tokens for an hour
+_PLACEMENT_CACHE = TTLCache(maxsize=1024, ttl=3600)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def _normalize_query(query: str) -> str:
+    return _WHITESPACE_RE.sub(' ', query.strip().lower())
 DATA_ROOT_DIRECTORY = "data"
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
@@ -70,12 +127,12 @@ AGENT_PREFIX = """
 You are working with a pandas dataframe in Python. The dataframe is named `df`.
 You are a helpful placement assistant designed to answer questions about student placements.
 
-Available columns: academic_year, department, s_no, name, roll_no, branch, company_name, pay_package_lpa
+Available columns: academic_year, department, s_no, name, roll_no, branch, company_name, company_name_lower, pay_package_lpa
 
 CRITICAL RULES:
 
 1. FOR STRING SEARCHES (like company names):
-   - Use case-insensitive containment: df['company_name'].str.contains('VALUE', case=False, na=False)
+   - Use the precomputed lowercase column with a lowercase search term: df['company_name_lower'].str.contains('value', regex=False, na=False)
    - NEVER use exact match (==) for company names
 
 2. PRINT WORKAROUND:
@@ -100,14 +157,20 @@ CRITICAL RULES:
      `Thought: I have the result. I will now provide this as the Final Answer.`
    - Then, provide the `Final Answer` exactly as it appeared in the `Observation`.
 
-EXAMPLES:
+Now, begin! Answer questions in a human-friendly way with proper context and formatting.
+"""
 
-Example 1 - Count query with context:
-Question: how many students at tcs ninja
-Thought: I need to count students at TCS NINJA using case-insensitive search
+# One worked example is injected per query, chosen by keyword overlap, so
+# the agent prompt carries a single relevant demonstration instead of all
+# six on every request.
+_TOKEN_RE = re.compile(r'[a-z]+')
+_AGENT_EXAMPLES = [
+    ("how many students count at company placed",
+     """Question: how many students at tcs ninja
+Thought: I need to count students at TCS NINJA using the lowercase company column
 Action: python_repl_ast
-Action Input: 
-count = df[df['company_name'].str.contains('TCS', case=False, na=False) & df['company_name'].str.contains('NINJA', case=False, na=False)].shape[0]
+Action Input:
+count = df[df['company_name_lower'].str.contains('tcs', regex=False, na=False) & df['company_name_lower'].str.contains('ninja', regex=False, na=False)].shape[0]
 print("🎯 TCS Ninja Placements")
 print("=" * 30)
 print("Total students placed: " + str(count))
@@ -117,10 +180,9 @@ Total students placed: 433
 Thought: I have the result. I will now provide this as the Final Answer.
 Final Answer: 🎯 TCS Ninja Placements
 ==============
-Total students placed: 433
-
-Example 2 - Overall placement summary:
-Question: how are placements
+Total students placed: 433"""),
+    ("how are placements overview summary stats overall",
+     """Question: how are placements
 Thought: I need total placements, unique students, unique companies, and average package
 Action: python_repl_ast
 Action Input:
@@ -142,10 +204,9 @@ Final Answer: 📊 Placement Overview
 Total placement records: 3217
 Unique students placed: 1962
 Total companies: 343
-Average package: 4.89 LPA
-
-Example 3 - Student with most offers (SHOW NAME + COMPANIES):
-Question: which student got more offers
+Average package: 4.89 LPA"""),
+    ("which student got more most offers multiple",
+     """Question: which student got more offers
 Thought: I need to find student with most offers and show their details
 Action: python_repl_ast
 Action Input:
@@ -190,17 +251,16 @@ Companies:
 3. INDWELL
 4. VOLTECH
 5. SUNTEK
-...
-
-Example 4 - Top company with more details:
-Question: which company is hiring the most
+..."""),
+    ("which company is hiring the most top recruiting companies",
+     """Question: which company is hiring the most
 Thought: I need top company with placement details
 Action: python_repl_ast
 Action Input:
 company_counts = df['company_name'].value_counts()
 top_company = company_counts.index[0]
 top_count = company_counts.iloc[0]
-company_data = df[df['company_name'].str.contains(top_company, case=False, na=False)]
+company_data = df[df['company_name_lower'].str.contains(top_company.lower(), regex=False, na=False)]
 avg_package = company_data['pay_package_lpa'].mean()
 
 print("🏢 Top Recruiting Company")
@@ -218,10 +278,9 @@ Final Answer: 🏢 Top Recruiting Company
 ==============
 Company: ACCENTURE
 Total placements: 307
-Average package: 4.55 LPA
-
-Example 5 - Year-wise with better formatting:
-Question: give year wise placements
+Average package: 4.55 LPA"""),
+    ("give year wise placements yearly breakdown",
+     """Question: give year wise placements
 Thought: I need to show placements by year with good formatting
 Action: python_repl_ast
 Action Input:
@@ -239,10 +298,9 @@ Final Answer: 📅 Year-wise Placements
 ==============
 2022-2023 → 1020 placements
 2023-2024 → 1097 placements
-2024-2025 → 1100 placements
-
-Example 6 - Highest package with student details:
-Question: who got highest package
+2024-2025 → 1100 placements"""),
+    ("who got highest maximum package salary pay",
+     """Question: who got highest package
 Thought: I need to find student with highest package and show details
 Action: python_repl_ast
 Action Input:
@@ -270,32 +328,147 @@ Student: NIHITHA VEMULAPALLI
 Roll No: 208W1A05H5
 Company: AMAZON
 Package: 52.6 LPA
-Department: CSE
-
-Now, begin! Answer questions in a human-friendly way with proper context and formatting.
-"""
+Department: CSE"""),
+]
+_AGENT_EXAMPLE_BANK = [
+    (frozenset(_TOKEN_RE.findall(keywords)), text)
+    for keywords, text in _AGENT_EXAMPLES
+]
+
+
+def _select_agent_example(query: str):
+    """Returns the worked example whose keywords best overlap the query, if any."""
+    query_tokens = set(_TOKEN_RE.findall(query.lower()))
+    best_text, best_score = None, 0
+    for keywords, text in _AGENT_EXAMPLE_BANK:
+        score = len(keywords & query_tokens)
+        if score > best_score:
+            best_text, best_score = text, score
+    return best_text
+
+
+# --- Placements Intent Router ---
+# The questions the AGENT_PREFIX demonstrates are also by far the most common
+# ones. They are answered directly from the DataFrame here, so only novel
+# queries pay for an LLM round-trip.
+
+def _intent_company_count(match):
+    company = match.group('company').strip(' ?.!')
+    mask = pd.Series(True, index=placements_df.index)
+    for word in company.split():
+        mask &= placements_df['company_name_lower'].str.contains(word, regex=False, na=False)
+    count = int(mask.sum())
+    if count == 0:
+        # The capture matched no company at all — it's probably a branch,
+        # department, or year. Decline and let the agent interpret it.
+        return None
+    return "\n".join([
+        f"🎯 {company.title()} Placements",
+        "=" * 30,
+        f"Total students placed: {count}"
+    ])
+
+def _intent_overview(match):
+    return "\n".join([
+        "📊 Placement Overview",
+        "=" * 40,
+        f"Total placement records: {placements_stats.total_records}",
+        f"Unique students placed: {placements_stats.unique_students}",
+        f"Total companies: {placements_stats.unique_companies}",
+        f"Average package: {round(placements_stats.avg_package, 2)} LPA"
+    ])
+
+def _intent_most_offers(match):
+    student_counts = placements_stats.student_counts
+    top_roll = student_counts.index[0]
+    student_data = placements_df[placements_df['roll_no'] == top_roll]
+    lines = [
+        "🌟 Student with Most Offers",
+        "=" * 40,
+        f"Name: {student_data['name'].iloc[0]}",
+        f"Roll No: {top_roll}",
+        f"Total offers: {int(student_counts.iloc[0])}",
+        "",
+        "Companies:"
+    ]
+    lines.extend(f"{i}. {company}" for i, company in enumerate(student_data['company_name'], 1))
+    return "\n".join(lines)
+
+def _intent_top_company(match):
+    company_counts = placements_stats.company_counts
+    top_company = company_counts.index[0]
+    avg_package = placements_df.loc[
+        placements_df['company_name'] == top_company, 'pay_package_lpa'
+    ].mean()
+    return "\n".join([
+        "🏢 Top Recruiting Company",
+        "=" * 40,
+        f"Company: {top_company}",
+        f"Total placements: {int(company_counts.iloc[0])}",
+        f"Average package: {round(avg_package, 2)} LPA"
+    ])
+
+def _intent_year_wise(match):
+    lines = ["📅 Year-wise Placements", "=" * 40]
+    for year, count in placements_stats.year_counts.items():
+        lines.append(f"{year} → {count} placements")
+    return "\n".join(lines)
+
+def _intent_highest_package(match):
+    top_student = placements_stats.max_package_row
+    return "\n".join([
+        "💰 Highest Package",
+        "=" * 40,
+        f"Student: {top_student['name']}",
+        f"Roll No: {top_student['roll_no']}",
+        f"Company: {top_student['company_name']}",
+        f"Package: {top_student['pay_package_lpa']} LPA",
+        f"Department: {top_student['branch']}"
+    ])
+
+PLACEMENTS_INTENTS = [
+    # Requiring "at" keeps branch/department/year phrasings ("placed in cse",
+    # "placements in 2023-24") out of the company slot.
+    (re.compile(r'how many (?:students?|people|placements?)\s+(?:are\s+)?(?:placed\s+)?at\s+(?P<company>.+)'), _intent_company_count),
+    # Anchored at the end so qualified questions ("how are placements at
+    # amazon") fall through to the agent instead of the global overview.
+    (re.compile(r'(?:\bhow (?:are|is|were) (?:the )?placements?|placement (?:overview|summary|stats))\s*[?.!]*$'), _intent_overview),
+    # "student(s)" required: "which company gave the most offers" is not
+    # the student-with-most-offers question.
+    (re.compile(r'\bstudents?\b.*\b(?:most|more) offers\b'), _intent_most_offers),
+    (re.compile(r'which company .*(?:hiring|recruit)|top (?:recruiting )?company'), _intent_top_company),
+    (re.compile(r'\byear[\s-]?wise\b'), _intent_year_wise),
+    # Anchored at the end: "highest package at tcs" needs the agent.
+    (re.compile(r'\b(?:highest (?:pay )?package|max(?:imum)? package)\s*[?.!]*$'), _intent_highest_package),
+]
+
+def route_placements_intent(query: str):
+    """Returns a direct DataFrame answer for recognized queries, else None."""
+    if placements_df is None:
+        return None
+    normalized = query.lower().strip()
+    for pattern, handler in PLACEMENTS_INTENTS:
+        match = pattern.search(normalized)
+        if match:
+            try:
+                answer = handler(match)
+            except Exception as e:
+                print(f"Intent handler failed, falling back to agent: {e}")
+                return None
+            # Handlers return None when the extracted slot doesn't validate;
+            # keep looking, then fall back to the agent.
+            if answer is not None:
+                return answer
+    return None
 
 def initialize_placements_agent():
     """Loads data and initializes the pandas agent for placements."""
-    global placements_agent, GOOGLE_API_KEY
+    global placements_agent, placements_df, placements_stats, GOOGLE_API_KEY
     try:
-        df = pd.read_csv("placements_data.csv", on_bad_lines='skip')
-        
-        # Clean up column names
-        df.columns = df.columns.str.lower().str.replace(r'[^a-z0-9_]', '', regex=True)
-        
-        # Rename for easier queries
-        df = df.rename(columns={
-            'companyname': 'company_name',
-            'paypackageinlpa': 'pay_package_lpa',
-            'sno': 'serial_number'
-        })
-        
-        if 'company_name' in df.columns:
-            df['company_name'] = df['company_name'].astype(str)
-        if 'pay_package_lpa' in df.columns:
-            df['pay_package_lpa'] = pd.to_numeric(df['pay_package_lpa'], errors='coerce')
+        df = get_placements_df()
 
+        placements_df = df
+        placements_stats = _compute_placement_stats(df)
         print("Placements data loaded and columns cleaned successfully.")
 
         # Initialize the Language Model
@@ -312,8 +485,11 @@ def initialize_placements_agent():
             prefix=AGENT_PREFIX,
             verbose=True,
             allow_dangerous_code=True,
-            max_iterations=5,
-            early_stopping_method="generate"
+            # The prompt demands single-shot execution, so two iterations
+            # (run code, then answer) bound the worst case; "force" stops
+            # without spending another LLM turn on a fallback answer.
+            max_iterations=2,
+            early_stopping_method="force"
         )
         print("Placements agent initialized successfully.")
 
@@ -322,23 +498,69 @@ def initialize_placements_agent():
     except Exception as e:
         print(f"Error initializing placements agent: {e}")
 
+def refresh_placements_data():
+    """
+    Reloads the CSV and hot-swaps it into the running agent.
+
+    The agent's prompt, tools, and LLM pipeline are invariant across data
+    refreshes, so instead of rebuilding the whole AgentExecutor we rebind
+    `df` inside its python REPL tool. Returns False when there is no agent
+    yet and a full initialization is needed.
+
+    Deliberately not exposed as an HTTP endpoint — a state-changing route
+    would let any client force CSV reloads. Call it from ops tooling
+    (e.g. a management shell) after replacing the CSV.
+    """
+    global placements_df, placements_stats
+    df = reload_placements_df()
+    placements_df = df
+    placements_stats = _compute_placement_stats(df)
+    _PLACEMENT_CACHE.clear()
+    if placements_agent is None:
+        return False
+    swapped = False
+    for tool in getattr(placements_agent, 'tools', []):
+        tool_locals = getattr(tool, 'locals', None)
+        if isinstance(tool_locals, dict) and 'df' in tool_locals:
+            tool_locals['df'] = df
+            swapped = True
+    return swapped
+
+
 # --- Course Chatbot Endpoints ---
+@lru_cache(maxsize=1)
+def _scan_departments(mtime_ns: int):
+    """
+    Walks the data directory once per root-directory mtime.
+
+    The mtime argument only serves as the cache key: as long as the data
+    root is untouched, repeated requests reuse the cached scan instead of
+    re-issuing listdir/stat syscalls.
+    """
+    departments_with_regulations = {}
+    with os.scandir(DATA_ROOT_DIRECTORY) as root_entries:
+        for dept in root_entries:
+            if not dept.is_dir():
+                continue
+            with os.scandir(dept.path) as dept_entries:
+                subdirs = [entry.name for entry in dept_entries if entry.is_dir()]
+            if subdirs and any(
+                os.path.exists(os.path.join(dept.path, subdir, "syllabus_data.json"))
+                for subdir in subdirs
+            ):
+                departments_with_regulations[dept.name] = subdirs
+            elif os.path.exists(os.path.join(dept.path, "syllabus_data.json")):
+                departments_with_regulations[dept.name] = []
+    return departments_with_regulations
+
 @app.get("/course/departments")
 async def get_departments():
     """Returns available departments and regulations for course chatbot."""
-    departments_with_regulations = {}
     if not os.path.exists(DATA_ROOT_DIRECTORY):
         raise HTTPException(status_code=404, detail="Data directory not found.")
     try:
-        for dept in os.listdir(DATA_ROOT_DIRECTORY):
-            dept_path = os.path.join(DATA_ROOT_DIRECTORY, dept)
-            if os.path.isdir(dept_path):
-                subdirs = [d for d in os.listdir(dept_path) if os.path.isdir(os.path.join(dept_path, d))]
-                if subdirs and any("syllabus_data.json" in os.listdir(os.path.join(dept_path, sd)) for sd in subdirs):
-                    departments_with_regulations[dept] = subdirs
-                elif "syllabus_data.json" in os.listdir(dept_path):
-                    departments_with_regulations[dept] = []
-        return {"departments": departments_with_regulations}
+        mtime_ns = os.stat(DATA_ROOT_DIRECTORY).st_mtime_ns
+        return {"departments": _scan_departments(mtime_ns)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error scanning directories: {e}")
 
@@ -355,20 +577,29 @@ async def handle_course_chat(request: ChatQuery):
     chatbot_key = f"{department}_{regulation}" if regulation else department
 
     if chatbot_key not in course_chatbots:
-        try:
-            print(f"Loading course chatbot for '{chatbot_key}'...")
-            course_chatbots[chatbot_key] = setup_enhanced_chatbot(
-                GEMINI_API_KEY, department, regulation, DATA_ROOT_DIRECTORY
-            )
-            print(f"Course chatbot for '{chatbot_key}' loaded successfully.")
-        except FileNotFoundError as e:
-            raise HTTPException(status_code=404, detail=str(e))
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to load course chatbot: {e}")
+        # Per-key lock: under a burst of requests for a new department only
+        # one coroutine runs the expensive setup, the rest await it.
+        lock = _chatbot_locks.setdefault(chatbot_key, asyncio.Lock())
+        async with lock:
+            if chatbot_key not in course_chatbots:
+                try:
+                    print(f"Loading course chatbot for '{chatbot_key}'...")
+                    course_chatbots[chatbot_key] = await asyncio.to_thread(
+                        setup_enhanced_chatbot,
+                        GEMINI_API_KEY, department, regulation, DATA_ROOT_DIRECTORY
+                    )
+                    print(f"Course chatbot for '{chatbot_key}' loaded successfully.")
+                except FileNotFoundError as e:
+                    raise HTTPException(status_code=404, detail=str(e))
+                except Exception as e:
+                    raise HTTPException(status_code=500, detail=f"Failed to load course chatbot: {e}")
 
     try:
         chatbot = course_chatbots[chatbot_key]
-        response = chatbot.chat(user_query)
+        # chat() is a synchronous RAG + LLM round-trip: run it off the event
+        # loop, with the semaphore keeping Gemini concurrency bounded.
+        async with _course_chat_semaphore:
+            response = await asyncio.to_thread(chatbot.chat, user_query)
         return response
     except Exception as e:
         print(f"Error during course chat processing: {e}")
@@ -384,14 +615,18 @@ async def ask_admissions_question(payload: AdmissionsQuery):
             detail="Admissions knowledge base not initialized."
         )
 
-    ai_response = admissions_app.get_rag_response(payload.question)
-    
+    # The admissions helpers are synchronous (LLM HTTP + Chroma reads), so
+    # run them in worker threads instead of blocking the event loop.
+    ai_response = await asyncio.to_thread(admissions_app.get_rag_response, payload.question)
+
     current_chat_history = payload.chat_history + [
         {'type': 'user', 'message': payload.question},
         {'type': 'ai', 'message': ai_response}
     ]
-    
-    suggested_questions = admissions_app.generate_followup_questions(current_chat_history)
+
+    suggested_questions = await asyncio.to_thread(
+        admissions_app.generate_followup_questions, current_chat_history
+    )
     
     return {
         "answer": ai_response,
@@ -406,48 +641,116 @@ async def get_admissions_status():
 # --- Placements Chatbot Endpoint (NEW) ---
 @app.post("/placements/ask")
 async def ask_placements_question(request: PlacementsQuery):
-    """Handles placements queries using the pandas agent."""
+    """Handles placements queries via the intent router, then the pandas agent."""
+    # Recognized questions are answered straight from the DataFrame,
+    # skipping the LLM entirely.
+    direct_answer = route_placements_intent(request.query)
+    if direct_answer is not None:
+        return {"answer": direct_answer}
+
     if not placements_agent:
         raise HTTPException(
             status_code=503, # Service Unavailable
             detail="Placements chatbot is not initialized. Check server logs."
         )
-    
+
+    cache_key = _normalize_query(request.query)
+    cached_answer = _PLACEMENT_CACHE.get(cache_key)
+    if cached_answer is not None:
+        return {"answer": cached_answer}
+
     try:
-        # The agent's 'invoke' method runs the query
-        response = placements_agent.invoke(request.query)
-        answer = response.get('output', 'Sorry, I had trouble processing that request.')
+        # Prepend the single most relevant worked example (if any) instead of
+        # shipping all six in the prefix on every request.
+        example = _select_agent_example(request.query)
+        if example:
+            agent_input = (f"Here is a worked example of a similar question:\n{example}\n\n"
+                           f"Question: {request.query}")
+        else:
+            agent_input = request.query
+        # ainvoke keeps the event loop free during the Gemini round-trip
+        response = await placements_agent.ainvoke({"input": agent_input})
+        answer = response.get('output')
+        if answer is None:
+            return {"answer": 'Sorry, I had trouble processing that request.'}
+        # Only cache real final answers: with max_iterations=2 and
+        # early_stopping_method="force", a run that hits the limit returns
+        # the AgentExecutor's stop sentinel, which must not be served from
+        # the cache for the next hour.
+        if "agent stopped due to" not in answer.lower():
+            _PLACEMENT_CACHE[cache_key] = answer
         return {"answer": answer}
     except Exception as e:
         print(f"Error during placements query: {e}")
         raise HTTPException(status_code=500, detail=f"An error occurred: {e}")
 
 # --- Main Integration Endpoint ---
+def load_index_html():
+    """Reads the chat interface into memory so GET / never touches disk."""
+    global INDEX_HTML
+    with open("integrated_chat.html", "r", encoding="utf-8") as f:
+        INDEX_HTML = f.read()
+
 @app.get("/", response_class=HTMLResponse)
 async def get_main_page():
-    """Serves the integrated chat interface."""
-    with open("integrated_chat.html", "r", encoding="utf-8") as f:
-        return f.read()
+    """Serves the integrated chat interface from the in-memory copy."""
+    if INDEX_HTML is None:
+        # Rare fallback before startup has primed the cache: do the disk
+        # read in a worker thread rather than on the event loop.
+        await asyncio.to_thread(load_index_html)
+    return HTMLResponse(INDEX_HTML)
 
 # --- Startup Event (Updated) ---
 @app.on_event("startup")
 async def startup_event():
     """Initialize admissions and placements chatbots on startup."""
     print("Starting Unified Chatbot System...")
-    
-    # Initialize admissions chatbot
-    if os.path.exists(admissions_app.KNOWLEDGE_BASE_PATH):
-        print(f"Initializing admissions chatbot from '{admissions_app.KNOWLEDGE_BASE_PATH}'...")
-        admissions_app.initialize_rag_chain()
-    else:
-        print(f"Warning: Admissions knowledge base not found at '{admissions_app.KNOWLEDGE_BASE_PATH}'")
-    
-    # Initialize placements chatbot
-    print("Initializing placements chatbot...")
-    initialize_placements_agent()
-    
+
+    # Cache the chat interface HTML in memory
+    load_index_html()
+
+    def init_admissions():
+        try:
+            if os.path.exists(admissions_app.KNOWLEDGE_BASE_PATH):
+                print(f"Initializing admissions chatbot from '{admissions_app.KNOWLEDGE_BASE_PATH}'...")
+                admissions_app.initialize_rag_chain()
+            else:
+                print(f"Warning: Admissions knowledge base not found at '{admissions_app.KNOWLEDGE_BASE_PATH}'")
+        except Exception as e:
+            print(f"Error initializing admissions chatbot: {e}")
+
+    def init_placements():
+        try:
+            print("Initializing placements chatbot...")
+            initialize_placements_agent()
+        except Exception as e:
+            print(f"Error initializing placements chatbot: {e}")
+
+    # Both initializers are I/O-bound (CSV read, vector store load, LLM
+    # handshakes); running them concurrently roughly halves cold start.
+    await asyncio.gather(
+        asyncio.to_thread(init_admissions),
+        asyncio.to_thread(init_placements)
+    )
+
     print("Unified Chatbot System ready!")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvloop + httptools (bundled with uvicorn[standard]) roughly double raw
+    # request throughput. One worker per core is only safe when a Chroma
+    # server (CHROMA_SERVER_HOST, see chatbot_script) owns the collections:
+    # cold-loading a course chatbot deletes and recreates its collection,
+    # and Chroma's embedded PersistentClient is not multi-process safe, so
+    # workers sharing ./chroma_db_by_dept would corrupt each other's
+    # collection handles.
+    workers = os.cpu_count() if os.environ.get("CHROMA_SERVER_HOST") else 1
+    uvicorn.run(
+        "integrated_main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning"
+    )
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Shared loader for the placements dataset.
+
+Both the unified FastAPI app (`integrated_main.py`) and the standalone
+placements CLI (`placements_chatbot.py`) need the same cleaned DataFrame;
+this module loads and caches it once per process so importing both entry
+points doesn't double the CSV I/O and memory footprint.
+"""
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+PLACEMENTS_CSV_PATH = "placements_data.csv"
+
+# Header normalization: strip non-identifier characters, then map the
+# squashed names onto the query-friendly ones, all in one rebind.
+_HEADER_CLEAN_RE = re.compile(r'[^a-z0-9_]')
+_COLUMN_RENAMES = {
+    'companyname': 'company_name',
+    'paypackageinlpa': 'pay_package_lpa',
+    'sno': 'serial_number'
+}
+
+
+@lru_cache(maxsize=1)
+def get_placements_df() -> pd.DataFrame:
+    """Loads, cleans, and caches the placements DataFrame."""
+    # The pyarrow engine parses the CSV into contiguous Arrow buffers
+    # (much less RAM than object-dtype strings); fall back to the C
+    # engine with bad-line skipping if pyarrow can't read the file.
+    try:
+        df = pd.read_csv(PLACEMENTS_CSV_PATH, engine="pyarrow")
+    except FileNotFoundError:
+        raise
+    except Exception as e:
+        print(f"pyarrow CSV engine unavailable ({e}); using the C engine.")
+        df = pd.read_csv(PLACEMENTS_CSV_PATH, on_bad_lines='skip')
+
+    # Clean and rename column headers in a single pass
+    cleaned = (_HEADER_CLEAN_RE.sub('', column.lower()) for column in df.columns)
+    df.columns = [_COLUMN_RENAMES.get(column, column) for column in cleaned]
+
+    if 'company_name' in df.columns:
+        df['company_name'] = df['company_name'].astype(str)
+        # One-time case fold so per-query searches skip it
+        df['company_name_lower'] = df['company_name'].str.lower()
+    if 'pay_package_lpa' in df.columns:
+        df['pay_package_lpa'] = pd.to_numeric(df['pay_package_lpa'], errors='coerce', downcast='float')
+
+    # The low-cardinality columns become categories: value_counts and
+    # groupby turn into integer-code operations.
+    for col in ('company_name', 'branch', 'department', 'academic_year'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+    return df
+
+
+def reload_placements_df() -> pd.DataFrame:
+    """Drops the cached DataFrame and loads a fresh copy from disk."""
+    get_placements_df.cache_clear()
+    return get_placements_df()